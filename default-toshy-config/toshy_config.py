@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-__version__ = '20260726'
+__version__ = '20261015'
 ###############################################################################
 ############################   Welcome to Toshy!   ############################
 ###
@@ -20,9 +20,9 @@ __version__ = '20260726'
 import os
 import re
 import sys
+import json
 import time
 import shutil
-import inspect
 import textwrap
 import subprocess
 
@@ -205,9 +205,10 @@ except AttributeError as e:
 # notifications and Synergy log monitoring work.
 home_dir = os.path.expanduser('~')
 icons_dir = os.path.join(home_dir, '.local', 'share', 'icons')
+cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(home_dir, '.cache')), 'toshy')
 
 # get the path of this file (not the main module loading it)
-config_globals = inspect.stack()[1][0].f_globals
+config_globals = sys._getframe(1).f_globals
 current_folder_path = os.path.dirname(os.path.abspath(config_globals["__config__"]))
 sys.path.insert(0, current_folder_path)
 
@@ -337,22 +338,17 @@ known_wlroots_compositors = [
 wlroots_compositors = locals().get('wlroots_compositors', [])
 
 all_wlroots_compositors = known_wlroots_compositors + wlroots_compositors
-
-# Direct the keymapper to try to use `wlroots` window context for
-# all DEs/WMs in user list, if list is not empty.
-if wlroots_compositors and WINDOW_MGR in wlroots_compositors:
-    debug(f"Will use 'wlroots' context provider for '{WINDOW_MGR}' WM", ctx="CG")
-    debug("File an issue on GitHub repo if this works for your WM.", ctx="CG")
-    _wl_compositor = 'wlroots'
-elif wlroots_compositors and DESKTOP_ENV in wlroots_compositors:
-    debug(f"Will use 'wlroots' context provider for '{DESKTOP_ENV}' DE", ctx="CG")
-    debug("File an issue on GitHub repo if this works for your DE.", ctx="CG")
-    _wl_compositor = 'wlroots'
-elif WINDOW_MGR in known_wlroots_compositors:
-    debug(f"WM '{WINDOW_MGR}' is in known 'wlroots' compositor list.", ctx="CG")
-    _wl_compositor = 'wlroots'
-elif DESKTOP_ENV in known_wlroots_compositors:
-    debug(f"DE '{DESKTOP_ENV}' is in known 'wlroots' compositor list.", ctx="CG")
+all_wlroots_set         = frozenset(all_wlroots_compositors)
+
+# Direct the keymapper to try to use `wlroots` window context for all DEs/WMs
+# in the user list or the known list (if the lists are not empty).
+if WINDOW_MGR in all_wlroots_set or DESKTOP_ENV in all_wlroots_set:
+    if WINDOW_MGR in known_wlroots_compositors or DESKTOP_ENV in known_wlroots_compositors:
+        debug(f"WM '{WINDOW_MGR}' / DE '{DESKTOP_ENV}' is in known 'wlroots' compositor list.", ctx="CG")
+    else:
+        # Matched only from the user's own 'wlroots_compositors' list
+        debug(f"Will use 'wlroots' context provider for WM '{WINDOW_MGR}' / DE '{DESKTOP_ENV}'", ctx="CG")
+        debug("File an issue on GitHub repo if this works for your WM/DE.", ctx="CG")
     _wl_compositor = 'wlroots'
 # elif (SESSION_TYPE, DESKTOP_ENV) == ('wayland', 'lxqt') and WINDOW_MGR == 'kwin_wayland':
 #     # The Toshy KWin script must be installed in the LXQt/KWin environment for this to work!
@@ -848,9 +844,6 @@ kbtype_lists = {
     'Apple':        keyboards_Apple
 }
 
-# List of all known keyboard devices from all lists
-all_keyboards       = [kb for kbtype in kbtype_lists.values() for kb in kbtype]
-
 # keyboard lists compiled to regex objects (replacing spaces with wildcards)
 kbds_IBM_rgx        = [re.compile(kb.replace(" ", ".*"), re.I) for kb in keyboards_IBM]
 kbds_Chromebook_rgx = [re.compile(kb.replace(" ", ".*"), re.I) for kb in keyboards_Chromebook]
@@ -865,8 +858,11 @@ kbtype_lists_rgx    = {
     'Apple':        kbds_Apple_rgx
 }
 
-# List of all known keyboard devices from all lists
-all_kbds_rgx        = re.compile(toRgxStr(all_keyboards), re.I)
+# All known keyboard devices from all lists, as one anchored alternation
+all_kbds_rgx        = re.compile(
+    "^(?:" + "|".join(  kb.casefold().replace('^','').replace('$','')
+                        for kb_lst in kbtype_lists.values() for kb in kb_lst ) + ")$",
+    re.I)
 
 not_win_type_rgx    = re.compile("IBM|Chromebook|Apple", re.I)
 
@@ -1369,22 +1365,80 @@ if not zenity_cmd:
 
 debug(f"Zenity command path: '{zenity_cmd}'")
 
-zenity_icon_option = None
 
-if zenity_cmd:
+def write_json_atomic(file_path: str, data) -> bool:
+    """
+    Write `data` as JSON to a temp file next to `file_path`, then rename it over
+    `file_path`, so readers never see partial JSON. On failure, logs the error,
+    removes the temp file and returns False.
+    """
+    tmp_file = f'{file_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_file, file_path)
+        return True
+    except (OSError, TypeError, ValueError) as e:
+        error(f"Could not write JSON file '{file_path}': {e}")
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass    # temp file was never created
+        return False
+
+
+def get_zenity_icon_option(zenity_cmd: str):
+    """
+    Return the icon option supported by this zenity/qarma binary, or None.
+    The '--help-info' probe result is cached on disk, keyed on the binary path
+    and modification time, so config reloads skip the subprocess until the
+    binary is replaced or updated.
+    """
+    cache_file = os.path.join(cache_dir, 'zenity_caps.json')
     try:
-        zenity_help_output = subprocess.check_output([zenity_cmd, '--help-info'])
-        help_text = str(zenity_help_output)
+        cache_key = f'{zenity_cmd}:{os.stat(zenity_cmd).st_mtime_ns}'
+    except OSError:
+        cache_key = None
+
+    if cache_key:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                zenity_caps = json.load(f)
+            if isinstance(zenity_caps, dict) and cache_key in zenity_caps:
+                return zenity_caps[cache_key]
+        except (OSError, ValueError):
+            pass    # missing, unreadable or corrupt cache file, just probe zenity
+
+    icon_option = None
+    try:
+        help_text = str(subprocess.check_output([zenity_cmd, '--help-info']))
         if '--icon=' in help_text:
-            zenity_icon_option = '--icon=toshy_app_icon_rainbow'
+            icon_option = '--icon=toshy_app_icon_rainbow'
         elif '--icon-name=' in help_text:
-            zenity_icon_option = '--icon-name=toshy_app_icon_rainbow'
+            icon_option = '--icon-name=toshy_app_icon_rainbow'
     except subprocess.CalledProcessError:
-        pass  # zenity --help-info failed, assume icon is not supported
+        # zenity --help-info failed, assume icon is not supported, but probe again next time
+        return icon_option
+
+    if cache_key:
+        write_json_atomic(cache_file, {cache_key: icon_option})
+
+    return icon_option
+
+
+zenity_icon_option = None
+
+if zenity_cmd:
+    zenity_icon_option = get_zenity_icon_option(zenity_cmd)
 else:
     error('ERR: Zenity command is missing! Diagnostic dialog not available!')
 
 
+# Single-pass escaping for the dialog text (no ordering issue with '&' like chained replace)
+markup_escape_tbl = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
 def notify_context():
     """pop up a dialog with context info"""
     def _notify_context(ctx: KeyContext):
@@ -1408,7 +1462,7 @@ def notify_context():
 
         # fix a problem with zenity and <tags> in text
         def escape_markup(text: str):
-            return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            return text.translate(markup_escape_tbl)
 
         ctx_clas        = ctx.wm_class
         ctx_name        = ctx.wm_name
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-__version__ = '20260726'
+__version__ = '20261015'
 ###############################################################################
 ############################   Welcome to Toshy!   ############################
 ###
@@ -20,16 +20,21 @@ __version__ = '20260726'
 import os
 import re
 import sys
+import json
 import time
+import hashlib
 import shutil
-import inspect
 import textwrap
+import threading
 import subprocess
 
 # Removing problematic types before they get deprecated:
 # from typing import Any, Callable, Optional, Union, List, Dict, Tuple
+from functools import lru_cache
 from subprocess import DEVNULL
 
+import xwaykeyz.lib.logger
+
 from xwaykeyz.config_api import *
 from xwaykeyz.lib.key_context import KeyContext
 from xwaykeyz.lib.logger import debug, error
@@ -133,17 +138,17 @@ except NameError:
 # notifications and Synergy log monitoring work.
 home_dir = os.path.expanduser('~')
 icons_dir = os.path.join(home_dir, '.local', 'share', 'icons')
+cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(home_dir, '.cache')), 'toshy')
 
 # get the path of this file (not the main module loading it)
-config_globals = inspect.stack()[1][0].f_globals
+config_globals = sys._getframe(1).f_globals
 current_folder_path = os.path.dirname(os.path.abspath(config_globals["__config__"]))
 sys.path.insert(0, current_folder_path)
 
 # Local imports after path has been set
-from toshy_common.env_context           import EnvironmentInfo
+from toshy_common.env_context           import EnvironmentInfo, __version__ as env_context_ver
 from toshy_common.kblayout_setup        import current_layout_name, start_kblayout_correction
 from toshy_common.machine_context       import get_machine_id_hash
-from toshy_common.notification_manager  import NotificationManager
 from toshy_common.overlay_context       import OverlayFlag as OFlag
 from toshy_common.proc_launcher         import launch_detached
 from toshy_common.runtime_utils         import sanitize_text
@@ -165,9 +170,8 @@ TOSHY_PART_NAME = 'Toshy Barebones Config'
 APP_VERSION     = __version__
 
 # Settings object used to tweak preferences "live" between gui, tray and config.
+# (The watchdog observers are started at the very end of this file, after parsing.)
 cnfg = Settings(current_folder_path)
-cnfg.watch_database()           # activate watchdog observer on the sqlite3 db file
-cnfg.watch_shared_devices()     # Look for network KVM apps and watch logs (on server only)
 # debug("")
 debug(cnfg, ctx="CG")
 
@@ -211,25 +215,103 @@ wlroots_compositors             = [
 ###  SLICE_MARK_END: env_overrides  ###  EDITS OUTSIDE THESE MARKS WILL BE LOST ON UPGRADE
 ###################################################################################################
 
+# Global variable to store the local machine ID at runtime, for machine-specific keymaps.
+# Allows syncing a single config file between different machines without overlapping the
+# hardware/media key overrides, or any other machine-specific customization.
+# Get the ID for each machine with the `toshy-machine-id` command, for use in `if` conditions.
+MACHINE_ID = get_machine_id_hash()
+
+
+def write_json_atomic(file_path: str, data) -> bool:
+    """
+    Write `data` as JSON to a temp file next to `file_path`, then rename it over
+    `file_path`, so readers never see partial JSON. On failure, logs the error,
+    removes the temp file and returns False.
+    """
+    tmp_file = f'{file_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_file, file_path)
+        return True
+    except (OSError, TypeError, ValueError) as e:
+        error(f"Could not write JSON file '{file_path}': {e}")
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass    # temp file was never created
+        return False
+
+
+env_ctxt_keys = ('DISTRO_ID', 'DISTRO_VER', 'VARIANT_ID', 'SESSION_TYPE',
+                    'DESKTOP_ENV', 'DE_MAJ_VER', 'WINDOW_MGR')
+
+# Detection results that may only mean "not ready yet" (e.g., keymapper service
+# started before the compositor), and must never be reused from the cache
+env_ctxt_uncacheable = (None, 'keymissing', 'WM_unidentified_by_logic')
+
+
+def get_env_info_cached(max_age_secs=3600):
+    """
+    Return the environment info dict, reusing a recent result cached on disk.
+    The cache file name is keyed on the machine ID, the session type/desktop
+    variables and the config/detection code versions, so a different session,
+    machine or Toshy upgrade never reuses another's result. Incomplete detection
+    results are returned but not cached. Expired cache files are pruned.
+    """
+    cache_key_src   = '|'.join([str(MACHINE_ID), __version__, env_context_ver] +
+                        [ os.environ.get(var, '') for var in
+                            ('XDG_SESSION_TYPE', 'XDG_CURRENT_DESKTOP',
+                                'XDG_SESSION_DESKTOP', 'DESKTOP_SESSION') ])
+    cache_key       = hashlib.blake2b(cache_key_src.encode(), digest_size=16).hexdigest()
+    cache_file      = os.path.join(cache_dir, f'env_ctxt_{cache_key}.json')
+
+    try:
+        if time.time() - os.path.getmtime(cache_file) < max_age_secs:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached_env_ctxt = json.load(f)
+            if isinstance(cached_env_ctxt, dict):
+                debug(f"Using cached environment info from: '{cache_file}'", ctx="CG")
+                return cached_env_ctxt
+    except (OSError, ValueError):
+        pass    # missing, unreadable or corrupt cache file, just run the detection
+
+    env_ctxt_getter = EnvironmentInfo()
+    fresh_env_ctxt: 'dict[str, str]' = env_ctxt_getter.get_env_info()
+
+    if any(fresh_env_ctxt.get(k, 'keymissing') in env_ctxt_uncacheable for k in env_ctxt_keys):
+        debug("Environment detection incomplete, not caching the result.", ctx="CG")
+        return fresh_env_ctxt
+
+    if write_json_atomic(cache_file, fresh_env_ctxt):
+        # Remove expired files left by other sessions or older Toshy versions
+        try:
+            with os.scandir(cache_dir) as entries:
+                for entry in entries:
+                    if (entry.name.startswith('env_ctxt_') and entry.name.endswith('.json')
+                            and entry.path != cache_file
+                            and time.time() - entry.stat().st_mtime >= max_age_secs):
+                        os.remove(entry.path)
+        except OSError as e:
+            debug(f"Could not prune old environment info cache files: {e}", ctx="CG")
+    return fresh_env_ctxt
+
+
+env_ctxt: 'dict[str, str]' = get_env_info_cached()
+
+env_ctxt_overrides = (  OVERRIDE_DISTRO_ID, OVERRIDE_DISTRO_VER, OVERRIDE_VARIANT_ID,
+                        OVERRIDE_SESSION_TYPE, OVERRIDE_DESKTOP_ENV, OVERRIDE_DE_MAJ_VER,
+                        OVERRIDE_WINDOW_MGR )
+
+# Merge in one step: 'keymissing' defaults, then detected values, then any set overrides
+env_ctxt_merged = { **dict.fromkeys(env_ctxt_keys, 'keymissing'),
+                    **env_ctxt,
+                    **{k: v for k, v in zip(env_ctxt_keys, env_ctxt_overrides) if v} }
+
 # Leave all of this alone! Don't try to override values here.
-DISTRO_ID                       = None
-DISTRO_VER                      = None
-VARIANT_ID                      = None
-SESSION_TYPE                    = None
-DESKTOP_ENV                     = None
-DE_MAJ_VER                      = None
-WINDOW_MGR                      = None
-
-env_ctxt_getter = EnvironmentInfo()
-env_ctxt: 'dict[str, str]' = env_ctxt_getter.get_env_info()
-
-DISTRO_ID       = locals().get('OVERRIDE_DISTRO_ID')    or env_ctxt.get('DISTRO_ID',    'keymissing')
-DISTRO_VER      = locals().get('OVERRIDE_DISTRO_VER')   or env_ctxt.get('DISTRO_VER',   'keymissing')
-VARIANT_ID      = locals().get('OVERRIDE_VARIANT_ID')   or env_ctxt.get('VARIANT_ID',   'keymissing')
-SESSION_TYPE    = locals().get('OVERRIDE_SESSION_TYPE') or env_ctxt.get('SESSION_TYPE', 'keymissing')
-DESKTOP_ENV     = locals().get('OVERRIDE_DESKTOP_ENV')  or env_ctxt.get('DESKTOP_ENV',  'keymissing')
-DE_MAJ_VER      = locals().get('OVERRIDE_DE_MAJ_VER')   or env_ctxt.get('DE_MAJ_VER',   'keymissing')
-WINDOW_MGR      = locals().get('OVERRIDE_WINDOW_MGR')   or env_ctxt.get('WINDOW_MGR',   'keymissing')
+(DISTRO_ID, DISTRO_VER, VARIANT_ID, SESSION_TYPE,
+    DESKTOP_ENV, DE_MAJ_VER, WINDOW_MGR) = (env_ctxt_merged[k] for k in env_ctxt_keys)
 
 # debug("")
 debug(  f'Toshy (barebones) config sees this environment:'
@@ -259,25 +341,23 @@ known_wlroots_compositors = [
 
 # Make sure the 'wlroots_compositors' list variable exists before checking it.
 # Older config files won't have it in the 'env_overrides' slice.
-wlroots_compositors = locals().get('wlroots_compositors', [])
+try:
+    wlroots_compositors
+except NameError:
+    wlroots_compositors = []
 
 all_wlroots_compositors = known_wlroots_compositors + wlroots_compositors
-
-# Direct the keymapper to try to use `wlroots` window context for
-# all DEs/WMs in user list, if list is not empty.
-if wlroots_compositors and WINDOW_MGR in wlroots_compositors:
-    debug(f"Will use 'wlroots' context provider for '{WINDOW_MGR}' WM", ctx="CG")
-    debug("File an issue on GitHub repo if this works for your WM.", ctx="CG")
-    _wl_compositor = 'wlroots'
-elif wlroots_compositors and DESKTOP_ENV in wlroots_compositors:
-    debug(f"Will use 'wlroots' context provider for '{DESKTOP_ENV}' DE", ctx="CG")
-    debug("File an issue on GitHub repo if this works for your DE.", ctx="CG")
-    _wl_compositor = 'wlroots'
-elif WINDOW_MGR in known_wlroots_compositors:
-    debug(f"WM '{WINDOW_MGR}' is in known 'wlroots' compositor list.", ctx="CG")
-    _wl_compositor = 'wlroots'
-elif DESKTOP_ENV in known_wlroots_compositors:
-    debug(f"DE '{DESKTOP_ENV}' is in known 'wlroots' compositor list.", ctx="CG")
+all_wlroots_set         = frozenset(all_wlroots_compositors)
+
+# Direct the keymapper to try to use `wlroots` window context for all DEs/WMs
+# in the user list or the known list (if the lists are not empty).
+if WINDOW_MGR in all_wlroots_set or DESKTOP_ENV in all_wlroots_set:
+    if WINDOW_MGR in known_wlroots_compositors or DESKTOP_ENV in known_wlroots_compositors:
+        debug(f"WM '{WINDOW_MGR}' / DE '{DESKTOP_ENV}' is in known 'wlroots' compositor list.", ctx="CG")
+    else:
+        # Matched only from the user's own 'wlroots_compositors' list
+        debug(f"Will use 'wlroots' context provider for WM '{WINDOW_MGR}' / DE '{DESKTOP_ENV}'", ctx="CG")
+        debug("File an issue on GitHub repo if this works for your WM/DE.", ctx="CG")
     _wl_compositor = 'wlroots'
 # elif (SESSION_TYPE, DESKTOP_ENV) == ('wayland', 'lxqt') and WINDOW_MGR == 'kwin_wayland':
 #     # The Toshy KWin script must be installed in the LXQt/KWin environment for this to work!
@@ -297,13 +377,6 @@ except NameError:
     pass
 
 
-# Global variable to store the local machine ID at runtime, for machine-specific keymaps.
-# Allows syncing a single config file between different machines without overlapping the
-# hardware/media key overrides, or any other machine-specific customization.
-# Get the ID for each machine with the `toshy-machine-id` command, for use in `if` conditions.
-MACHINE_ID = get_machine_id_hash()
-
-
 
 #################  VARIABLES  ####################
 ###                                            ###
@@ -345,11 +418,19 @@ cse         = 'cse'         # key label for matchProps() arg to enable: case sen
 lst         = 'lst'         # key label for matchProps() arg to pass in a [list] of {dicts}
 dbg         = 'dbg'         # key label for matchProps() arg to set debugging info string
 
-# global variables for the isDoubleTap() function
-tapTime1 = time.time()
-tapInterval = 0.24
-tapCount = 0
-last_dt_combo = None
+class DoubleTapState:
+    """Shared state for the isDoubleTap() function (one slotted object, not four globals)."""
+    __slots__ = ('tapTime1', 'tapInterval', 'tapCount', 'last_dt_combo')
+
+    def __init__(self):
+        self.tapTime1       = time.monotonic()
+        self.tapInterval    = 0.24
+        self.tapCount       = 0
+        self.last_dt_combo  = None
+
+
+# state object for the isDoubleTap() function
+dt_state = DoubleTapState()
 
 
 
@@ -367,6 +448,10 @@ last_dt_combo = None
 ######################################################
 
 
+# Translation table that deletes '^' and '$' anchors in a single pass over a string
+strip_anchors_tbl = str.maketrans('', '', '^$')
+
+
 def toRgxStr(lst_of_str) -> str:
     """
     Convert a list of strings into single casefolded regex pattern string.
@@ -374,16 +459,23 @@ def toRgxStr(lst_of_str) -> str:
     def raise_TypeError(): raise TypeError(f"\n\n###  toRgxStr wants a list of strings  ###\n")
     if not isinstance(lst_of_str, list): raise_TypeError()
     if any([not isinstance(x, str) for x in lst_of_str]): raise_TypeError()
-    lst_of_str_clean = [str(x).replace('^','').replace('$','') for x in lst_of_str]
+    return _toRgxStr_cached(tuple(lst_of_str))
+
+
+@lru_cache(maxsize=None)
+def _toRgxStr_cached(tuple_of_str: 'tuple[str, ...]') -> str:
+    """Cached worker for toRgxStr(), keyed on the (hashable) tuple of strings."""
+    lst_of_str_clean = [str(x).translate(strip_anchors_tbl) for x in tuple_of_str]
     return "|".join('^'+x.casefold()+'$' for x in lst_of_str_clean)
 
 
+@lru_cache(maxsize=4096)
 def negRgx(rgx_str):
     """
     Convert positive match regex pattern into negative lookahead regex pattern.
     """
     # remove any ^$
-    rgx_str_strip = str(rgx_str).replace('^','').replace('$','')
+    rgx_str_strip = str(rgx_str).translate(strip_anchors_tbl)
     # add back ^$, but only around ENTIRE STRING (ignore any vertical bars/pipes)
     rgx_str_add = str('^'+rgx_str_strip+'$')
     # convert ^$ to complicated negative lookahead pattern that actually works
@@ -444,16 +536,24 @@ kbtype_lists = {
     'Apple':        keyboards_Apple
 }
 
-# List of all known keyboard devices from all lists
-all_keyboards       = [kb for kbtype in kbtype_lists.values() for kb in kbtype]
 
-# keyboard lists compiled to regex objects (replacing spaces with wildcards)
-kbds_IBM_rgx        = [re.compile(kb.replace(" ", ".*"), re.I) for kb in keyboards_IBM]
-kbds_Chromebook_rgx = [re.compile(kb.replace(" ", ".*"), re.I) for kb in keyboards_Chromebook]
-kbds_Windows_rgx    = [re.compile(kb.replace(" ", ".*"), re.I) for kb in keyboards_Windows]
-kbds_Apple_rgx      = [re.compile(kb.replace(" ", ".*"), re.I) for kb in keyboards_Apple]
+def kbds_to_union_rgx(kb_lst: 'list[str]', kbtype: str):
+    """
+    Compile a list of keyboard device names into one alternation regex object
+    (replacing spaces with wildcards), plus the bare keyboard type name itself,
+    so a type name found anywhere in the device name also matches.
+    """
+    rgx_strs = [f"(?:{kb.replace(' ', '.*')})" for kb in kb_lst] + [re.escape(kbtype)]
+    return re.compile("|".join(rgx_strs), re.I)
 
-# Dict mapping keyboard type keywords onto
+
+# keyboard lists compiled to a single union regex object per keyboard type
+kbds_IBM_rgx        = kbds_to_union_rgx(keyboards_IBM,          'IBM')
+kbds_Chromebook_rgx = kbds_to_union_rgx(keyboards_Chromebook,   'Chromebook')
+kbds_Windows_rgx    = kbds_to_union_rgx(keyboards_Windows,      'Windows')
+kbds_Apple_rgx      = kbds_to_union_rgx(keyboards_Apple,        'Apple')
+
+# Dict mapping keyboard type keywords onto union regex objects
 kbtype_lists_rgx    = {
     'IBM':          kbds_IBM_rgx,
     'Chromebook':   kbds_Chromebook_rgx,
@@ -461,8 +561,11 @@ kbtype_lists_rgx    = {
     'Apple':        kbds_Apple_rgx
 }
 
-# List of all known keyboard devices from all lists
-all_kbds_rgx        = re.compile(toRgxStr(all_keyboards), re.I)
+# All known keyboard devices from all lists, as one anchored alternation
+all_kbds_rgx        = re.compile(
+    "^(?:" + "|".join(  kb.casefold().translate(strip_anchors_tbl)
+                        for kb_lst in kbtype_lists.values() for kb in kb_lst ) + ")$",
+    re.I)
 
 not_win_type_rgx    = re.compile("IBM|Chromebook|Apple", re.I)
 
@@ -491,22 +594,136 @@ not_win_type_rgx    = re.compile("IBM|Chromebook|Apple", re.I)
 ###########################################################################################
 
 
+class LazyNotificationManager:
+    """
+    Stand-in for a NotificationManager instance that only imports and creates
+    the real object (which probes the 'notify-send' command) on first use.
+    """
+    def __init__(self, *args, **kwargs):
+        self._ntfy_args     = args
+        self._ntfy_kwargs   = kwargs
+        self._ntfy          = None
+
+    def _get_ntfy(self):
+        if self._ntfy is None:
+            from toshy_common.notification_manager import NotificationManager
+            self._ntfy = NotificationManager(*self._ntfy_args, **self._ntfy_kwargs)
+        return self._ntfy
+
+    def __getattr__(self, attr_name):
+        return getattr(self._get_ntfy(), attr_name)
+
+
 # Instantiate a useful notification object class instance, to make notifications easier
-ntfy = NotificationManager(icon_file_active, title='Toshy Alert (Config)')
+ntfy = LazyNotificationManager(icon_file_active, title='Toshy Alert (Config)')
+
+
+# Set of valid keyboard type strings (case sensitive)
+valid_kbtypes = frozenset({'IBM', 'Chromebook', 'Windows', 'Apple'})
+
+
+class IsKBtypeCondition:
+    """Keymap condition object that is True when KBTYPE matches the bound type."""
+    __slots__ = ('kbtype',)
+
+    def __init__(self, kbtype: str):
+        self.kbtype = kbtype
+
+    def __call__(self, ctx: KeyContext):
+        return KBTYPE == self.kbtype
 
 
 def isKBtype(kbtype: str, map=None):
     # guard against failure to give valid type arg (we don't need to casefold anything with this)
-    if kbtype not in ['IBM', 'Chromebook', 'Windows', 'Apple']:
+    if kbtype not in valid_kbtypes:
         raise ValueError(f"Invalid type given to isKBtype() function: '{kbtype}'"
                 f'\n\t Valid keyboard types (case sensitive): IBM | Chromebook | Windows | Apple')
-    def _isKBtype(ctx: KeyContext):
-        # debug(f"KBTYPE: '{KBTYPE}' | isKBtype check from map: '{map}'")
-        return kbtype == KBTYPE
-    return _isKBtype
+    return IsKBtypeCondition(kbtype)
 
 
-kbtype_cache_dct = {}
+@lru_cache(maxsize=256)
+def classify_kbtype(kbd_dev_name_cf: str) -> 'tuple[str, str]':
+    """
+    Classify a casefolded keyboard device name. Returns a tuple of the keyboard
+    type string (or 'unidentified') and a short reason for the debug log.
+    Pure function of the name (and the module-level lists), so results are cached.
+    """
+    # Check if there is a custom type for the device
+    custom_kbtype = kbds_UserCustom_dct_cf.get(kbd_dev_name_cf, '')
+    if custom_kbtype and custom_kbtype in valid_kbtypes:
+        return custom_kbtype, 'Custom type for dev'
+
+    # Check against the keyboard type lists, or the type string in the device name
+    # (one union regex per type)
+    for kbtype, rgx in kbtype_lists_rgx.items():
+        if rgx.search(kbd_dev_name_cf):
+            return kbtype, 'Rgx or type name matched on dev'
+
+    # Check if the device name indicates a "Windows" keyboard
+    if ('windows' not in kbd_dev_name_cf
+        and not not_win_type_rgx.search(kbd_dev_name_cf)
+        and not all_kbds_rgx.search(kbd_dev_name_cf) ):
+        return 'Windows', 'Default type for dev'
+
+    return 'unidentified', 'Dev fell through all checks'
+
+
+class KBtypeDiskCache:
+    """
+    Casefolded device name -> keyboard type results, persisted in a small JSON file so
+    devices seen in earlier runs skip classification after a keymapper restart. The file
+    is read lazily on first use, and written a few seconds after a change (debounced).
+    Stored results are discarded if the keyboard lists or custom types have changed.
+    """
+    def __init__(self, file_path: str, lists_sig: str, save_delay_secs=5.0):
+        self.file_path          = file_path
+        self.lists_sig          = lists_sig
+        self.save_delay_secs    = save_delay_secs
+        self._devices: 'dict[str, str]' = {}
+        self._loaded            = False
+        self._save_timer        = None
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+        except (OSError, ValueError):
+            return      # missing or corrupt cache file, start empty
+        if not isinstance(cache_data, dict) or cache_data.get('lists_sig') != self.lists_sig:
+            return
+        devices = cache_data.get('devices')
+        if isinstance(devices, dict):
+            self._devices = {k: v for k, v in devices.items() if v in valid_kbtypes}
+
+    def get(self, kbd_dev_name_cf: str):
+        if not self._loaded:
+            self._load()
+        return self._devices.get(kbd_dev_name_cf)
+
+    def set(self, kbd_dev_name_cf: str, kbtype: str):
+        if not self._loaded:
+            self._load()
+        if self._devices.get(kbd_dev_name_cf) == kbtype:
+            return
+        self._devices[kbd_dev_name_cf] = kbtype
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay_secs, self._save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save(self):
+        self._save_timer = None
+        cache_data = {'lists_sig': self.lists_sig, 'devices': dict(self._devices)}
+        write_json_atomic(self.file_path, cache_data)
+
+
+# Signature of the lists used by classify_kbtype(), to invalidate stale stored results
+kbtype_lists_sig = hashlib.blake2b(
+    json.dumps([kbds_UserCustom_dct_cf, kbtype_lists], sort_keys=True).encode(),
+    digest_size=8).hexdigest()
+
+kbtype_disk_cache = KBtypeDiskCache(os.path.join(cache_dir, 'kbtype_cache.json'), kbtype_lists_sig)
 
 
 def getKBtype(ctx: KeyContext):
@@ -520,72 +737,41 @@ def getKBtype(ctx: KeyContext):
     #### Hierarchy of validations:
 
     - Check if a forced override of keyboard type is applied by user preference.
-    - Check cache dictionary for device name stored from previous run of function.
-    - Check if the device name is in the keyboards_UserCustom_dct dictionary.
-    - Check if the device name matches any keyboard type list.
-    - Check if any keyboard type string is found in the device name string.
-    - Check if the device name indicates a "Windows" keyboard by excluding other types.
+    - Check the on-disk cache of types stored for devices in earlier runs.
+    - Classify the device name with classify_kbtype() (results are cached):
+        - Check if the device name is in the keyboards_UserCustom_dct dictionary.
+        - Check if the device name matches any keyboard type list,
+            or contains the keyboard type string.
+        - Check if the device name indicates a "Windows" keyboard by excluding other types.
     """
 
-    valid_kbtypes = ['IBM', 'Chromebook', 'Windows', 'Apple']
-
     # debug(f"Entering getKBtype with override value: '{cnfg.override_kbtype}'")
     global KBTYPE
     kbd_dev_name = ctx.device_name
 
-    def log_kbtype(msg, cache_dev):
-        debug(f"KBTYPE: '{KBTYPE}' | {msg}: '{kbd_dev_name}'")
-        if cache_dev:
-            kbtype_cache_dct[kbd_dev_name] = (KBTYPE, msg)
-
     # If user wants to override, apply override and return.
     # Breaks per-device adaptatation capability while engaged!
     if cnfg.override_kbtype in valid_kbtypes:
         KBTYPE = cnfg.override_kbtype
-        log_kbtype(f"WARNING: Override applied! Dev", cache_dev=False)
-        return
-
-    # Check in the kbtype cache dict for the device
-    if kbd_dev_name in kbtype_cache_dct:
-        KBTYPE, cached_msg = kbtype_cache_dct[kbd_dev_name]
-        log_kbtype(f'(CACHED) {cached_msg}', cache_dev=False)
-        return
-
-    kbd_dev_name_cf = ctx.device_name.casefold()
-
-    # Check if there is a custom type for the device
-    custom_kbtype = kbds_UserCustom_dct_cf.get(kbd_dev_name_cf, '')
-    if custom_kbtype and custom_kbtype in valid_kbtypes:
-        KBTYPE = custom_kbtype
-        log_kbtype('Custom type for dev', cache_dev=True)
+        if xwaykeyz.lib.logger.VERBOSE:
+            debug(f"KBTYPE: '{KBTYPE}' | WARNING: Override applied! Dev: '{kbd_dev_name}'")
         return
 
-    # Check against the keyboard type lists
-    for kbtype, regex_lst in kbtype_lists_rgx.items():
-        for rgx in regex_lst:
-            if rgx.search(kbd_dev_name_cf):
-                KBTYPE = kbtype
-                log_kbtype('Rgx matched on dev', cache_dev=True)
-                return
-
-    # Check if any keyboard type string is found in the device name
-    for kbtype in ['IBM', 'Chromebook', 'Windows', 'Apple']:
-        if kbtype.casefold() in kbd_dev_name_cf:
-            KBTYPE = kbtype
-            log_kbtype('Type in dev name', cache_dev=True)
-            return
+    # Casefolded name is the cache key, so case variants share one cache entry
+    kbd_dev_name_cf = kbd_dev_name.casefold()
 
-    # Check if the device name indicates a "Windows" keyboard
-    if ('windows' not in kbd_dev_name_cf
-        and not not_win_type_rgx.search(kbd_dev_name_cf)
-        and not all_kbds_rgx.search(kbd_dev_name_cf) ):
-        KBTYPE = 'Windows'
-        log_kbtype('Default type for dev', cache_dev=True)
-        return
+    stored_kbtype = kbtype_disk_cache.get(kbd_dev_name_cf)
+    if stored_kbtype is not None:
+        KBTYPE, kbtype_msg = stored_kbtype, '(CACHED) Stored type for dev'
+    else:
+        KBTYPE, kbtype_msg = classify_kbtype(kbd_dev_name_cf)
+        if KBTYPE in valid_kbtypes:
+            kbtype_disk_cache.set(kbd_dev_name_cf, KBTYPE)
 
-    # Default to None if no matching keyboard type is found
-    KBTYPE = 'unidentified'
-    error(f"KBTYPE: '{KBTYPE}' | Dev fell through all checks: '{kbd_dev_name}'")
+    if KBTYPE == 'unidentified':
+        error(f"KBTYPE: '{KBTYPE}' | {kbtype_msg}: '{kbd_dev_name}'")
+    elif xwaykeyz.lib.logger.VERBOSE:
+        debug(f"KBTYPE: '{KBTYPE}' | {kbtype_msg}: '{kbd_dev_name}'")
 
 
 
@@ -614,40 +800,47 @@ def isDoubleTap(dt_combo):
     The proper way to do this would be inside the keymapper, in the async event loop
     that deals with input/output functions.
     """
+    # Local alias, so each tap reads a closure cell instead of looking up 'time.monotonic'.
+    # (Not a default argument: the keymapper passes 'ctx' to actions with a parameter.)
+    _now = time.monotonic
     def _isDoubleTap():
-        global tapTime1
-        global tapInterval
-        global tapCount
-        global last_dt_combo
-        _tapTime = time.time()
+        dt = dt_state
+        _tapTime = _now()
+        # Skip building debug strings on this input hot path unless logging is verbose.
+        verbose = xwaykeyz.lib.logger.VERBOSE
         # This first "if" block has a logic defect, if a different key in the
         # same keymap is also set up to send the same "dt_combo" value.
-        if tapCount == 1 and last_dt_combo != dt_combo:
-            debug(f'## isDoubleTap: \n\tDifferent combo: \n\t{last_dt_combo, dt_combo=}')
-            last_dt_combo = None
-            tapCount = 0
+        if dt.tapCount == 1 and dt.last_dt_combo != dt_combo:
+            if verbose:
+                debug(f'## isDoubleTap: \n\tDifferent combo: \n\t{dt.last_dt_combo, dt_combo=}')
+            dt.last_dt_combo = None
+            dt.tapCount = 0
         # 2nd tap beyond time interval? Treat as new double-tap cycle.
-        if tapCount == 1 and _tapTime - tapTime1 >= tapInterval:
-            debug(f'## isDoubleTap: \n\tTime diff (too long): \n\t{_tapTime - tapTime1=}')
-            tapCount = 0
+        if dt.tapCount == 1 and _tapTime - dt.tapTime1 >= dt.tapInterval:
+            if verbose:
+                debug(f'## isDoubleTap: \n\tTime diff (too long): \n\t{_tapTime - dt.tapTime1=}')
+            dt.tapCount = 0
         # Try to keep held key from producing repeats of dt_combo.
         # If repeat rate very slow or delay very short, this won't work well.
-        if tapCount == 1 and _tapTime - tapTime1 < 0.07:
-            debug(f'## isDoubleTap: \n\tTime diff (too short): \n\t{_tapTime - tapTime1=}')
-            tapCount = 0
+        if dt.tapCount == 1 and _tapTime - dt.tapTime1 < 0.07:
+            if verbose:
+                debug(f'## isDoubleTap: \n\tTime diff (too short): \n\t{_tapTime - dt.tapTime1=}')
+            dt.tapCount = 0
             return None
         # 2nd tap within interval window? Reset cycle & send dt_combo.
-        if tapCount == 1 and _tapTime - tapTime1 < tapInterval:
-            debug(f'## isDoubleTap: \n\tTime diff (just right): \n\t{_tapTime - tapTime1=}')
-            tapCount = 0
-            tapTime1 = 0.0
+        if dt.tapCount == 1 and _tapTime - dt.tapTime1 < dt.tapInterval:
+            if verbose:
+                debug(f'## isDoubleTap: \n\tTime diff (just right): \n\t{_tapTime - dt.tapTime1=}')
+            dt.tapCount = 0
+            dt.tapTime1 = 0.0
             return dt_combo
         # New cycle? Set count = 1, tapTime1 = now. Send nothing.
-        if tapCount == 0:
-            debug(f'## isDoubleTap: \n\tTime diff (1st cycle): \n\t{_tapTime - tapTime1=}')
-            last_dt_combo = dt_combo
-            tapCount = 1
-            tapTime1 = _tapTime
+        if dt.tapCount == 0:
+            if verbose:
+                debug(f'## isDoubleTap: \n\tTime diff (1st cycle): \n\t{_tapTime - dt.tapTime1=}')
+            dt.last_dt_combo = dt_combo
+            dt.tapCount = 1
+            dt.tapTime1 = _tapTime
             return None
     return _isDoubleTap
 
@@ -698,22 +891,58 @@ if not zenity_cmd:
 
 debug(f"Zenity command path: '{zenity_cmd}'")
 
-zenity_icon_option = None
 
-if zenity_cmd:
+def get_zenity_icon_option(zenity_cmd: str):
+    """
+    Return the icon option supported by this zenity/qarma binary, or None.
+    The '--help-info' probe result is cached on disk, keyed on the binary path
+    and modification time, so config reloads skip the subprocess until the
+    binary is replaced or updated.
+    """
+    cache_file = os.path.join(cache_dir, 'zenity_caps.json')
+    try:
+        cache_key = f'{zenity_cmd}:{os.stat(zenity_cmd).st_mtime_ns}'
+    except OSError:
+        cache_key = None
+
+    if cache_key:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                zenity_caps = json.load(f)
+            if isinstance(zenity_caps, dict) and cache_key in zenity_caps:
+                return zenity_caps[cache_key]
+        except (OSError, ValueError):
+            pass    # missing, unreadable or corrupt cache file, just probe zenity
+
+    icon_option = None
     try:
-        zenity_help_output = subprocess.check_output([zenity_cmd, '--help-info'])
-        help_text = str(zenity_help_output)
+        help_text = str(subprocess.check_output([zenity_cmd, '--help-info']))
         if '--icon=' in help_text:
-            zenity_icon_option = '--icon=toshy_app_icon_rainbow'
+            icon_option = '--icon=toshy_app_icon_rainbow'
         elif '--icon-name=' in help_text:
-            zenity_icon_option = '--icon-name=toshy_app_icon_rainbow'
+            icon_option = '--icon-name=toshy_app_icon_rainbow'
     except subprocess.CalledProcessError:
-        pass  # zenity --help-info failed, assume icon is not supported
+        # zenity --help-info failed, assume icon is not supported, but probe again next time
+        return icon_option
+
+    if cache_key:
+        write_json_atomic(cache_file, {cache_key: icon_option})
+
+    return icon_option
+
+
+zenity_icon_option = None
+
+if zenity_cmd:
+    zenity_icon_option = get_zenity_icon_option(zenity_cmd)
 else:
     error('ERR: Zenity command is missing! Diagnostic dialog not available!')
 
 
+# Single-pass escaping for the dialog text (no ordering issue with '&' like chained replace)
+markup_escape_tbl = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
 def notify_context():
     """pop up a dialog with context info"""
     def _notify_context(ctx: KeyContext):
@@ -737,7 +966,7 @@ def notify_context():
 
         # fix a problem with zenity and <tags> in text
         def escape_markup(text: str):
-            return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            return text.translate(markup_escape_tbl)
 
         ctx_clas        = ctx.wm_class
         ctx_name        = ctx.wm_name
@@ -912,3 +1141,12 @@ keymap("Diagnostics (MultiTap)", {
 #     C("Shift-Alt-RC-h"):        isDoubleTap(notify_context),    # Diagnostic dialog (alternate)
 #     C("Shift-Alt-RC-t"):        isDoubleTap(macro_tester),      # Type out test macro
 # }, when = lambda _: True is True)
+
+
+
+###################################################################################################
+# Start the preferences watchers last, after the whole config has been parsed. Settings are
+# already loaded when the 'cnfg' object is created, so nothing above needs the watchers, and
+# an early database change event can no longer start a settings reload in the middle of parsing.
+cnfg.watch_database()           # activate watchdog observer on the sqlite3 db file
+cnfg.watch_shared_devices()     # Look for network KVM apps and watch logs (on server only)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+tests/test_terminal_utils.py
+
+Focused tests for run_cmd_lst_in_terminal() terminal selection, using fake
+executables in a temp PATH directory and a stubbed launcher that records
+launch attempts instead of spawning processes: candidate order for a DE
+(given or detected), the $TERMINAL preference, PATH entries shadowed by
+directories, the PATH snapshot rebuilding when PATH changes, and resolving
+the command to launch.
+
+Runnable standalone (accumulates a score in main) and collectable by
+pytest (bool-returning test functions).
+"""
+__version__ = '20261015'
+
+
+import os
+import sys
+import types
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Stub out proc_launcher BEFORE package imports: it pulls in the xwaykeyz
+# logger at module level, and stubbing also lets tests record launch
+# attempts instead of spawning processes.
+_launch_calls_lst = []
+_failing_paths_set = set()
+
+
+def _fake_launch_detached(args, **kwargs):
+    # Like the real launcher, report failure when the command is not found
+    _launch_calls_lst.append(list(args))
+    return bool(shutil.which(args[0])) and args[0] not in _failing_paths_set
+
+
+_fake_proc_launcher = types.ModuleType('toshy_common.proc_launcher')
+_fake_proc_launcher.launch_detached = _fake_launch_detached
+sys.modules['toshy_common.proc_launcher'] = _fake_proc_launcher
+_fake_logger = types.ModuleType('toshy_common.logger')
+_fake_logger.debug = lambda *args, **kwargs: None
+_fake_logger.error = lambda *args, **kwargs: None
+_fake_logger.VERBOSE = False
+sys.modules['toshy_common.logger'] = _fake_logger
+
+import toshy_common.terminal_utils as term_utils
+
+
+_COMMAND_LST = ['/bin/echo', 'hello']
+
+
+def _check(label_str: str, condition: bool) -> bool:
+    marker = 'ok  ' if condition else 'FAIL'
+    print(f'  [{marker}] {label_str}')
+    return condition
+
+
+def _make_exe(dir_path, name_str, executable=True):
+    file_path = os.path.join(dir_path, name_str)
+    with open(file_path, 'w', encoding='utf-8') as file_obj:
+        file_obj.write('#!/bin/sh\n')
+    os.chmod(file_path, 0o755 if executable else 0o644)
+    return file_path
+
+
+def _run(desktop_env):
+    """Run the selection, returning the launched command list or None if none launched."""
+    _launch_calls_lst.clear()
+    try:
+        if term_utils.run_cmd_lst_in_terminal(list(_COMMAND_LST), desktop_env=desktop_env):
+            return _launch_calls_lst[-1]
+    except term_utils.TerminalNotFoundError:
+        pass
+    return None
+
+
+def _with_env(test_fn, **env_dct):
+    """Run test_fn with PATH, TERMINAL and env_dct vars set (None unsets), then restore."""
+    saved_dct = {name: os.environ.get(name) for name in ('PATH', 'TERMINAL', *env_dct)}
+    try:
+        for name in saved_dct:
+            if env_dct.get(name) is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = env_dct[name]
+        _failing_paths_set.clear()
+        return test_fn()
+    finally:
+        for name, value in saved_dct.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        _failing_paths_set.clear()
+
+
+def test_candidate_order_for_de() -> bool:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths_dct = {name: _make_exe(temp_dir, name)
+                        for name in ('xterm', 'kitty', 'konsole', 'gnome-terminal')}
+
+        def inner() -> bool:
+            all_ok = True
+            launched_lst = _run('KDE')
+            all_ok &= _check("DE's own terminal is launched first, with its exec args",
+                launched_lst == [paths_dct['konsole'], '-e'] + _COMMAND_LST)
+
+            _failing_paths_set.update(paths_dct.values())
+            launched_lst = _run('kde')
+            tried_lst = [call_lst[0] for call_lst in _launch_calls_lst]
+            all_ok &= _check('then every other installed terminal, in TERMINAL_APPS order',
+                tried_lst == [paths_dct[name] for name in
+                                ('konsole', 'gnome-terminal', 'kitty', 'xterm')])
+            all_ok &= _check('no terminal is tried twice, and none launched raises',
+                launched_lst is None)
+
+            _failing_paths_set.clear()
+            launched_lst = _run('')
+            all_ok &= _check('empty desktop_env skips the DE pass',
+                launched_lst[:2] == [paths_dct['gnome-terminal'], '--'])
+            return all_ok
+
+        print('\n--- Candidate order for a DE ---')
+        return _with_env(inner, PATH=temp_dir, TERMINAL=None)
+
+
+def test_terminal_env_preference() -> bool:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        xterm_path = _make_exe(temp_dir, 'xterm')
+        konsole_path = _make_exe(temp_dir, 'konsole')
+        unknown_path = _make_exe(temp_dir, 'myterm')
+
+        def inner() -> bool:
+            all_ok = True
+            launched_lst = _run('kde')
+            all_ok &= _check('$TERMINAL is tried before the DE terminal',
+                launched_lst == [xterm_path, '-e'] + _COMMAND_LST)
+
+            _failing_paths_set.add(xterm_path)
+            _run('kde')
+            tried_lst = [call_lst[0] for call_lst in _launch_calls_lst]
+            all_ok &= _check('failed $TERMINAL is not retried from the candidate list',
+                tried_lst == [xterm_path, konsole_path])
+
+            _failing_paths_set.clear()
+            os.environ['TERMINAL'] = unknown_path
+            _run('kde')
+            tried_lst = [call_lst[0] for call_lst in _launch_calls_lst]
+            all_ok &= _check('unknown terminal in $TERMINAL is ignored',
+                tried_lst == [konsole_path])
+            return all_ok
+
+        print('\n--- $TERMINAL preference ---')
+        return _with_env(inner, PATH=temp_dir, TERMINAL='xterm')
+
+
+def test_shadowed_path_entries() -> bool:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first_dir = os.path.join(temp_dir, 'first')
+        second_dir = os.path.join(temp_dir, 'second')
+        os.makedirs(os.path.join(first_dir, 'xterm'))
+        os.makedirs(second_dir)
+        _make_exe(first_dir, 'kitty', executable=False)
+        xterm_path = _make_exe(second_dir, 'xterm')
+        kitty_path = _make_exe(second_dir, 'kitty')
+
+        def inner() -> bool:
+            all_ok = True
+            all_ok &= _check('directory earlier on PATH does not shadow the executable',
+                term_utils._which_cached('xterm') == xterm_path)
+            all_ok &= _check('non-executable file earlier on PATH does not shadow it',
+                term_utils._which_cached('kitty') == kitty_path)
+            all_ok &= _check('missing command resolves to None',
+                term_utils._which_cached('alacritty') is None)
+            launched_lst = _run('')
+            all_ok &= _check('launch uses the real executable',
+                launched_lst is not None and launched_lst[0] == kitty_path)
+            return all_ok
+
+        print('\n--- Shadowed PATH entries ---')
+        return _with_env(inner, PATH=os.pathsep.join([first_dir, second_dir]), TERMINAL=None)
+
+
+def test_path_snapshot_rebuild() -> bool:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first_dir = os.path.join(temp_dir, 'first')
+        second_dir = os.path.join(temp_dir, 'second')
+        os.makedirs(first_dir)
+        os.makedirs(second_dir)
+        xterm_path = _make_exe(first_dir, 'xterm')
+        kitty_path = _make_exe(second_dir, 'kitty')
+
+        def inner() -> bool:
+            all_ok = True
+            launched_lst = _run('')
+            all_ok &= _check('terminal found on the first PATH',
+                launched_lst is not None and launched_lst[0] == xterm_path)
+
+            os.environ['PATH'] = second_dir
+            launched_lst = _run('')
+            all_ok &= _check('snapshot rebuilt after PATH changes',
+                launched_lst is not None and launched_lst[0] == kitty_path)
+
+            os.remove(kitty_path)
+            all_ok &= _check('stale snapshot entry is retried and then raises',
+                _run('') is None)
+            konsole_path = _make_exe(second_dir, 'konsole')
+            launched_lst = _run('')
+            all_ok &= _check('terminal installed later is found with the same PATH',
+                launched_lst is not None and launched_lst[0] == konsole_path)
+            return all_ok
+
+        print('\n--- PATH snapshot rebuild ---')
+        return _with_env(inner, PATH=first_dir, TERMINAL=None)
+
+
+def test_detected_desktop_env() -> bool:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        gnome_term_path = _make_exe(temp_dir, 'gnome-terminal')
+        konsole_path = _make_exe(temp_dir, 'konsole')
+
+        def inner() -> bool:
+            all_ok = True
+            saved_de = term_utils._detected_de
+            try:
+                term_utils._detected_de = None
+                os.environ['XDG_CURRENT_DESKTOP'] = 'KDE'
+                launched_lst = _run(None)
+                all_ok &= _check("desktop_env=None detects the DE and tries its terminal first",
+                    launched_lst is not None and launched_lst[0] == konsole_path)
+
+                os.environ['XDG_CURRENT_DESKTOP'] = 'X-Cinnamon'
+                _run(None)
+                all_ok &= _check('detected DE is kept for the life of the process',
+                    term_utils._detected_de == 'kde')
+
+                term_utils._detected_de = None
+                launched_lst = _run(None)
+                all_ok &= _check("'X-Cinnamon' is detected as 'cinnamon', like EnvironmentInfo",
+                    term_utils._detected_de == 'cinnamon')
+                all_ok &= _check('and its own terminal is tried first',
+                    launched_lst is not None and launched_lst[0] == gnome_term_path)
+            finally:
+                term_utils._detected_de = saved_de
+            return all_ok
+
+        print('\n--- Detected desktop environment ---')
+        return _with_env(inner, PATH=temp_dir, TERMINAL=None, XDG_CURRENT_DESKTOP=None,
+                            XDG_SESSION_DESKTOP=None, DESKTOP_SESSION=None, WAYFIRE_SOCKET=None)
+
+
+def test_launched_command_resolution() -> bool:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _make_exe(temp_dir, 'xterm')
+
+        def inner() -> bool:
+            all_ok = True
+            _launch_calls_lst.clear()
+            term_utils.run_cmd_lst_in_terminal(['toshy-services-log'], desktop_env='')
+            all_ok &= _check('command not on PATH is passed on as a bare name',
+                _launch_calls_lst[-1][-1] == 'toshy-services-log')
+
+            cmd_path = _make_exe(temp_dir, 'toshy-services-log')
+            _launch_calls_lst.clear()
+            term_utils.run_cmd_lst_in_terminal(['toshy-services-log'], desktop_env='')
+            all_ok &= _check('command installed later resolves to its absolute path',
+                _launch_calls_lst[-1][-1] == cmd_path)
+            return all_ok
+
+        print('\n--- Launched command resolution ---')
+        return _with_env(inner, PATH=temp_dir, TERMINAL=None)
+
+
+def main():
+    results_lst = [
+        test_candidate_order_for_de(),
+        test_terminal_env_preference(),
+        test_shadowed_path_entries(),
+        test_path_snapshot_rebuild(),
+        test_detected_desktop_env(),
+        test_launched_command_resolution(),
+    ]
+    passed_cnt = sum(1 for result in results_lst if result)
+    print(f'\nScore: {passed_cnt}/{len(results_lst)} test groups passed')
+    return 0 if passed_cnt == len(results_lst) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# End of file #
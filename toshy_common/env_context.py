@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-__version__ = '20260730'
+__version__ = '20261015'
 
 import os
 import re
@@ -90,6 +90,11 @@ class EnvironmentInfo:
 
         return self.env_info_dct
 
+    def get_desktop_env(self):
+        """Get only the simplified desktop environment name (None if not identified)"""
+        self._get_desktop_environment()
+        return self.DESKTOP_ENV
+
     def read_release_files(self) -> "dict[str, str]":
         paths = [
             '/etc/os-release', '/etc/lsb-release', '/etc/arch-release'
@@ -46,11 +46,11 @@ The `mru_layouts` table is handled separately (`_save_mru_layouts` plus its own
 query in `load_settings`) and does not follow the four-step pattern above.
 """
 
-__version__ = '20260803'
+__version__ = '20261015'
 
 import os
+import sys
 import time
-import inspect
 import sqlite3
 import textwrap
 import traceback
@@ -81,8 +81,7 @@ class Settings:
         self.last_settings          = None
         self.current_settings       = None
         # Get the name of the module that instantiated the class
-        calling_frame               = inspect.stack()[1]
-        calling_file_path           = calling_frame.filename
+        calling_file_path           = sys._getframe(1).f_code.co_filename
         calling_module              = os.path.split(calling_file_path)[1]
         self.calling_module         = calling_module
 
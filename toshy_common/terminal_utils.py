@@ -5,19 +5,23 @@ Simple terminal emulator detection and command execution with optional
 desktop environment awareness for optimal terminal selection.
 """
 
-__version__ = "20260615"
+__version__ = "20261015"
 
 import os
 import re
 import shutil
 import subprocess
 
+from itertools import repeat
+
+from toshy_common.env_context import EnvironmentInfo
 from toshy_common.logger import debug
 from toshy_common.proc_launcher import launch_detached
 
 
 local_bin = os.path.join(os.path.expanduser('~'), '.local', 'bin')
-if local_bin not in os.environ.get('PATH', '').split(os.pathsep):
+# Padding both sides with separators makes this a whole-entry match, without a split() list
+if f'{os.pathsep}{local_bin}{os.pathsep}' not in f'{os.pathsep}{os.environ.get("PATH", "")}{os.pathsep}':
     os.environ['PATH'] = local_bin + os.pathsep + os.environ.get('PATH', '')
 
 class TerminalNotFoundError(RuntimeError):
@@ -26,48 +30,168 @@ class TerminalNotFoundError(RuntimeError):
 
 
 # List of common terminal emulators in descending order of preference.
-# Each element is a tuple: (command_name, args_list, supported_DEs)
+# Each element is a tuple: (command_name, args_tuple, supported_DEs)
 TERMINAL_APPS = [
-    ('gnome-terminal',          ['--'],     ['gnome', 'unity', 'cinnamon']     ),
-    ('ptyxis',                  ['--'],     ['gnome', 'unity', 'cinnamon']     ),
-    ('konsole',                 ['-e'],     ['kde']                            ),
-    ('xfce4-terminal',          ['-e'],     ['xfce']                           ),
-    ('mate-terminal',           ['-e'],     ['mate']                           ),
-    ('qterminal',               ['-e'],     ['lxqt']                           ),
-    ('lxterminal',              ['-e'],     ['lxde']                           ),
-    ('terminology',             ['-e'],     ['enlightenment']                  ),
-    ('cosmic-term',             ['-e'],     ['cosmic']                         ),
-    ('io.elementary.terminal',  ['-e'],     ['pantheon']                       ),
-    ('kitty',                   ['-e'],     []                                 ),
-    ('alacritty',               ['-e'],     []                                 ),
-    ('tilix',                   ['-e'],     []                                 ),
-    ('terminator',              ['-e'],     []                                 ),
-    ('xterm',                   ['-e'],     []                                 ),
-    ('rxvt',                    ['-e'],     []                                 ),
-    ('urxvt',                   ['-e'],     []                                 ),
-    ('st',                      ['-e'],     []                                 ),
-    ('kgx',                     ['-e'],     []                                 ),  # GNOME Console
+    ('gnome-terminal',          ('--',),    ['gnome', 'unity', 'cinnamon']     ),
+    ('ptyxis',                  ('--',),    ['gnome', 'unity', 'cinnamon']     ),
+    ('konsole',                 ('-e',),    ['kde']                            ),
+    ('xfce4-terminal',          ('-e',),    ['xfce']                           ),
+    ('mate-terminal',           ('-e',),    ['mate']                           ),
+    ('qterminal',               ('-e',),    ['lxqt']                           ),
+    ('lxterminal',              ('-e',),    ['lxde']                           ),
+    ('terminology',             ('-e',),    ['enlightenment']                  ),
+    ('cosmic-term',             ('-e',),    ['cosmic']                         ),
+    ('io.elementary.terminal',  ('-e',),    ['pantheon']                       ),
+    ('kitty',                   ('-e',),    []                                 ),
+    ('alacritty',               ('-e',),    []                                 ),
+    ('tilix',                   ('-e',),    []                                 ),
+    ('terminator',              ('-e',),    []                                 ),
+    ('xterm',                   ('-e',),    []                                 ),
+    ('rxvt',                    ('-e',),    []                                 ),
+    ('urxvt',                   ('-e',),    []                                 ),
+    ('st',                      ('-e',),    []                                 ),
+    ('kgx',                     ('-e',),    []                                 ),  # GNOME Console
 ]
 
+# Reverse index of TERMINAL_APPS: desktop environment -> [(command_name, args_list), ...]
+# in the same order of preference, so the DE-specific pass is a single dict lookup.
+# ALL_TERMINALS is the same (command_name, args_list) pairs without the DE column, in
+# TERMINAL_APPS order. TERMINAL_ARGS gives the args for a known terminal named in the
+# $TERMINAL env var.
+DE_TO_TERMINALS = {}
+ALL_TERMINALS = tuple((_terminal_cmd, _args_list) for _terminal_cmd, _args_list, _ in TERMINAL_APPS)
+TERMINAL_ARGS = dict(ALL_TERMINALS)
+for _terminal_cmd, _args_list, _de_list in TERMINAL_APPS:
+    for _de in _de_list:
+        DE_TO_TERMINALS.setdefault(_de, []).append((_terminal_cmd, _args_list))
+
+
+# Snapshot of the PATH directories (file name -> first full path), shutil.which()-style
+# results including misses (None), the installed terminals and the per-DE order to try
+# them in, all valid for the PATH value they were built from
+_path_index = {}
+_which_cache = {}
+_installed_terminals = None
+_terminals_for_de = {}
+_snapshot_path = None
+
+
+def _build_path_index(path_str):
+    """Map each file name in the PATH directories to its first full path, in one scan"""
+    path_index = {}
+    for dir_path in path_str.split(os.pathsep):
+        try:
+            with os.scandir(dir_path) as dir_entries:
+                for dir_entry in dir_entries:
+                    path_index.setdefault(dir_entry.name, dir_entry.path)
+        except OSError:
+            continue    # empty, missing or unreadable PATH entry
+    return path_index
+
+
+def _refresh_path_snapshot():
+    """Rebuild the PATH snapshot and drop everything resolved from it, if PATH has changed"""
+    global _path_index, _installed_terminals, _snapshot_path
+    current_path = os.environ.get('PATH', '')
+    if current_path != _snapshot_path:
+        _path_index = _build_path_index(current_path)
+        _which_cache.clear()
+        _installed_terminals = None
+        _terminals_for_de.clear()
+        _snapshot_path = current_path
+
+
+def _invalidate_path_snapshot():
+    """Force a rebuild on next use, e.g. to pick up a terminal installed since the snapshot"""
+    global _snapshot_path
+    _snapshot_path = None
+
+
+def _which_cached(cmd):
+    """shutil.which() answered from a PATH snapshot, cached until PATH changes"""
+    _refresh_path_snapshot()
+    if cmd not in _which_cache:
+        if os.sep in cmd:
+            cmd_path = shutil.which(cmd)
+        else:
+            cmd_path = _path_index.get(cmd)
+            # The first match may be a directory or non-executable file that
+            # shutil.which() would skip over, so let it settle those rare cases
+            if cmd_path and not (os.path.isfile(cmd_path) and os.access(cmd_path, os.X_OK)):
+                cmd_path = shutil.which(cmd)
+        _which_cache[cmd] = cmd_path
+    return _which_cache[cmd]
+
+
+def _get_installed_terminals():
+    """ALL_TERMINALS entries found on PATH, as (terminal_path, args_list), in preference order"""
+    global _installed_terminals
+    _refresh_path_snapshot()
+    if _installed_terminals is None:
+        installed_terminals = []
+        for terminal_cmd, args_list in ALL_TERMINALS:
+            terminal_path = _which_cached(terminal_cmd)
+            if terminal_path:
+                installed_terminals.append((terminal_path, args_list))
+        _installed_terminals = tuple(installed_terminals)
+    return _installed_terminals
+
+
+def _get_terminals_for_de(desktop_env):
+    """
+    Installed terminals to try for a desktop environment, as (terminal_path, args_list):
+    the DE's own terminals first, then every other installed terminal, in preference order.
+    Built once per DE, so later calls just walk a short tuple of absolute paths.
+    """
+    _refresh_path_snapshot()
+    if desktop_env not in _terminals_for_de:
+        de_terminals = []
+        for terminal_cmd, args_list in DE_TO_TERMINALS.get(desktop_env, ()):
+            terminal_path = _which_cached(terminal_cmd)
+            if terminal_path:
+                de_terminals.append((terminal_path, args_list))
+        de_paths = {terminal_path for terminal_path, _ in de_terminals}
+        other_terminals = [ entry for entry in _get_installed_terminals()
+                            if entry[0] not in de_paths ]
+        _terminals_for_de[desktop_env] = tuple(de_terminals + other_terminals)
+    return _terminals_for_de[desktop_env]
+
+
+_detected_de = None
+
+
+def _detect_desktop_env():
+    """
+    DE name for callers that give no desktop_env, detected once per process with the
+    same logic and simplified names as EnvironmentInfo (e.g., 'cinnamon' for 'X-Cinnamon',
+    'gnome' for 'ubuntu:GNOME'). Returns an empty string if the DE can't be identified.
+    """
+    global _detected_de
+    if _detected_de is None:
+        _detected_de = (EnvironmentInfo().get_desktop_env() or '').casefold()
+    return _detected_de
+
 
 def run_cmd_lst_in_terminal(command_list, desktop_env: str=None):
     """
     Execute a command in the most appropriate terminal emulator.
     
-    Tries to find a matching terminal for the desktop environment first,
-    then falls back to any available terminal.
+    Tries the terminal named in the $TERMINAL environment variable first
+    (if it is one of the known TERMINAL_APPS), then a matching terminal for
+    the desktop environment, then falls back to any available terminal.
     
     Args:
         command_list: List of strings - command and arguments to execute
         desktop_env: String or None - desktop environment (e.g., 'gnome', 'kde')
-                    If None, skips DE-specific terminal selection
+                    If None, detected like EnvironmentInfo does (once per process)
+                    If empty, skips DE-specific terminal selection
         
     Returns:
         Boolean - True if command was successfully launched, False otherwise
     """
 
-    # Validate input
-    if not isinstance(command_list, list) or not all(isinstance(item, str) for item in command_list):
+    # Validate input (map() keeps the per-item type check in C, with no generator frame)
+    if not isinstance(command_list, list) or not all(map(isinstance, command_list, repeat(str))):
         debug('run_cmd_lst_in_terminal() expects a list of strings.')
         return False
 
@@ -75,34 +199,53 @@ def run_cmd_lst_in_terminal(command_list, desktop_env: str=None):
         debug('run_cmd_lst_in_terminal() received empty command list.')
         return False
 
+    # Resolved paths of terminals already tried, so $TERMINAL isn't retried from the list
+    attempted = set()
+
     def _try_terminal(terminal_cmd, args_list):
         """Try to run command in a specific terminal. Returns True if successful."""
-        full_command = [terminal_cmd] + args_list + command_list
-        if not launch_detached(full_command):
+        terminal_path = _which_cached(terminal_cmd)
+        if not terminal_path or terminal_path in attempted:
+            return False
+        attempted.add(terminal_path)
+        full_command = [terminal_path, *args_list, *command_list]
+        # An absolute path, no inherited fds to close and no stdio fds 0-2 lets
+        # subprocess use posix_spawn() (vfork-style) instead of fork() + exec()
+        if not launch_detached(full_command, close_fds=False, stdin=subprocess.DEVNULL):
             return False
         debug(f"Successfully launched command in {terminal_cmd}")
         return True
 
     # Resolve bare command names to absolute paths so terminal emulators
     # can find commands even if the launched shell lacks ~/.local/bin on PATH
+    # (looked up fresh each call, so a miss isn't cached like the terminal lookups)
     if '/' not in command_list[0]:
         resolved = shutil.which(command_list[0])
         if resolved:
             command_list = [resolved] + command_list[1:]
 
-    # First pass: Try DE-specific terminals if desktop_env is provided
-    if desktop_env:
-        desktop_env = desktop_env.casefold()
-        for terminal_cmd, args_list, de_list in TERMINAL_APPS:
-            if desktop_env in de_list:
-                if _try_terminal(terminal_cmd, args_list):
-                    return True
-
-    # Second pass: Try any available terminal
-    for terminal_cmd, args_list, _ in TERMINAL_APPS:
-        if _try_terminal(terminal_cmd, args_list):
+    # Honor an explicit user preference before probing for anything else, but only for
+    # a known terminal: a wrong exec flag would open nothing yet still count as launched
+    preferred_terminal = os.environ.get('TERMINAL')
+    if preferred_terminal:
+        preferred_args = TERMINAL_ARGS.get(os.path.basename(preferred_terminal))
+        if preferred_args is None:
+            debug(f"Ignoring unknown terminal in $TERMINAL: '{preferred_terminal}'")
+        elif _try_terminal(preferred_terminal, preferred_args):
             return True
 
+    if desktop_env is None:
+        desktop_env = _detect_desktop_env()
+
+    # Try the DE's own terminals first (if the DE is given or detected), then any other.
+    # If nothing launches, a terminal may have been installed since the PATH snapshot was
+    # taken (same PATH string), so rebuild the snapshot and go through the list once more.
+    for _ in range(2):
+        for terminal_path, args_list in _get_terminals_for_de(desktop_env.casefold()):
+            if _try_terminal(terminal_path, args_list):
+                return True
+        _invalidate_path_snapshot()
+
     # If we reach here, no terminal was found
     message = 'No suitable terminal emulator could be found.'
     debug(f"ERROR: {message} (terminal_utils)")